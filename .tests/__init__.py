@@ -1 +1 @@
-__all__ = ['import_confit', 'test_install']
+__all__ = ['test_install']
@@ -0,0 +1,70 @@
+from importlib.util import spec_from_loader, module_from_spec
+from importlib.machinery import SourceFileLoader
+from pathlib import Path
+import sys
+import pytest
+
+"""
+Contains all the magic required to load the `confit` module, which is neither
+in PYTHONPATH, nor has the `.py` extension that is required for automated
+loading. pytest executes this file before collecting the tests, so the module
+is loaded exactly once and installed in `sys.modules`. Any test module can
+then use the normal import machinery:
+```
+import confit
+from confit import ConfitError
+```
+NOTE: 'SourceFileLoader' caches the compiled bytecode in '__pycache__/' next to the
+`confit` script (even without the `.py` extension), so it's only recompiled if the
+script has changed. The path is resolved relative to this file, so the same cache
+is used independent of the current working directory.
+
+Tests must change global state of the `confit` module (e.g. `confit.rsync`) only
+through the `monkeypatch` fixture. That way, they don't depend on each other and
+can be run in parallel with `pytest-xdist`:
+```
+python -m pytest -n auto --dist loadfile .tests
+```
+With `--dist loadfile`, all tests of a module run on the same worker, so module
+scoped fixtures (e.g. the installation sources) are only created once.
+"""
+
+
+def _load_once():
+    """
+    Load the `confit` script as module (if it's not already loaded).
+    """
+    if 'confit' in sys.modules:
+        return sys.modules['confit']
+    confit_path = Path(__file__).resolve().parent.parent / 'confit'
+    spec = spec_from_loader("confit", SourceFileLoader("confit", str(confit_path)))
+    if not spec:
+        raise RuntimeError(f"Failed to load 'confit' module from '{confit_path}'!")
+    confit = module_from_spec(spec)
+    assert spec.loader
+    spec.loader.exec_module(confit)
+    return confit
+
+
+sys.modules.setdefault('confit', _load_once())
+
+
+@pytest.fixture(scope="session")
+def rsync_path():
+    """
+    The full path of the 'rsync' binary (or None), looked up once per test session.
+    """
+    return sys.modules['confit'].find_rsync()
+
+
+@pytest.fixture(params=[False, True], ids=["cp", "rsync"])
+def use_rsync(request, rsync_path, monkeypatch):
+    """
+    Disable ('cp') or enable ('rsync') rsync for the current test.
+    """
+    if request.param:
+        assert rsync_path and "rsync" in rsync_path, "Test failed because of missing 'rsync'"
+        monkeypatch.setattr(sys.modules['confit'], "rsync", rsync_path, raising=False)
+    else:
+        monkeypatch.setattr(sys.modules['confit'], "rsync", None, raising=False)
+    return request.param
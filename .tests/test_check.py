@@ -1,5 +1,5 @@
 from unittest.mock import patch
-from import_confit import confit
+import confit
 from pathlib import Path
 
 
@@ -1,132 +1,189 @@
-import pytest
-import tempfile
-from pathlib import Path
-from import_confit import confit
-
-
-def test_diff_no_difference():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in both source and destination directories
-        src_file = src_dir / "testfile.txt"
-        dst_file = dst_dir / "testfile.txt"
-        content = "This is a test file."
-        with open(src_file, "w") as f:
-            f.write(content)
-        with open(dst_file, "w") as f:
-            f.write(content)
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
-        # Perform the diff
-        assert not group.diff()
-
-
-def test_diff_with_difference():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in both source and destination directories with different content
-        src_file = src_dir / "testfile.txt"
-        dst_file = dst_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-        with open(dst_file, "w") as f:
-            f.write("This is a different test file.")
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
-        # Perform the diff
-        assert group.diff()
-
-
-def test_diff_file_missing_in_dest():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source directory
-        src_dir = tempdir_path / "src"
-        src_dir.mkdir()
-
-        # Create a sample file in the source directory
-        src_file = src_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=tempdir_path / "dst",
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
-        # Perform the diff
-        assert group.diff()
-
-
-def test_diff_directory():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create subdirectories and files in the source directory
-        sub_dir = src_dir / "subdir"
-        sub_dir.mkdir()
-        file1 = sub_dir / "file1.txt"
-        file2 = sub_dir / "file2.txt"
-        with open(file1, "w") as f:
-            f.write("This is file 1.")
-        with open(file2, "w") as f:
-            f.write("This is file 2.")
-
-        # Create corresponding subdirectories and files in the destination directory with different content
-        dst_sub_dir = dst_dir / "subdir"
-        dst_sub_dir.mkdir()
-        dst_file1 = dst_sub_dir / "file1.txt"
-        dst_file2 = dst_sub_dir / "file2.txt"
-        with open(dst_file1, "w") as f:
-            f.write("This is a different file 1.")
-        with open(dst_file2, "w") as f:
-            f.write("This is a different file 2.")
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir), "src")]
-        )
-
-        # Perform the diff
-        assert group.diff()
-
-
-if __name__ == "__main__":
-    pytest.main()
+import confit
+
+
+def test_diff_no_difference(tmp_path):
+    # Create source and destination directories
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+
+    # Create a sample file in both source and destination directories
+    src_file = src_dir / "testfile.txt"
+    dst_file = dst_dir / "testfile.txt"
+    content = b"This is a test file."
+    with open(src_file, "wb") as f:
+        f.write(content)
+    with open(dst_file, "wb") as f:
+        f.write(content)
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_file), "testfile.txt")]
+    )
+
+    # Perform the diff
+    assert not group.diff()
+
+
+def test_diff_with_difference(tmp_path):
+    # Create source and destination directories
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+
+    # Create a sample file in both source and destination directories with different content
+    src_file = src_dir / "testfile.txt"
+    dst_file = dst_dir / "testfile.txt"
+    with open(src_file, "wb") as f:
+        f.write(b"This is a test file.")
+    with open(dst_file, "wb") as f:
+        f.write(b"This is a different test file.")
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_file), "testfile.txt")]
+    )
+
+    # Perform the diff
+    assert group.diff()
+
+
+def test_diff_file_missing_in_dest(tmp_path):
+    # Create source directory
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+
+    # Create a sample file in the source directory
+    src_file = src_dir / "testfile.txt"
+    with open(src_file, "wb") as f:
+        f.write(b"This is a test file.")
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=tmp_path / "dst",
+        install_files=[(str(src_file), "testfile.txt")]
+    )
+
+    # Perform the diff
+    assert group.diff()
+
+
+def test_diff_directory(tmp_path):
+    # Create source and destination directories
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+
+    # Create subdirectories and files in the source directory
+    sub_dir = src_dir / "subdir"
+    sub_dir.mkdir()
+    file1 = sub_dir / "file1.txt"
+    file2 = sub_dir / "file2.txt"
+    with open(file1, "wb") as f:
+        f.write(b"This is file 1.")
+    with open(file2, "wb") as f:
+        f.write(b"This is file 2.")
+
+    # Create corresponding subdirectories and files in the destination directory with different content
+    dst_sub_dir = dst_dir / "subdir"
+    dst_sub_dir.mkdir()
+    dst_file1 = dst_sub_dir / "file1.txt"
+    dst_file2 = dst_sub_dir / "file2.txt"
+    with open(dst_file1, "wb") as f:
+        f.write(b"This is a different file 1.")
+    with open(dst_file2, "wb") as f:
+        f.write(b"This is a different file 2.")
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir / "subdir"), "subdir")]
+    )
+
+    # Perform the diff
+    assert group.diff()
+
+
+def _make_tree(root, files):
+    """
+    Create the given files (with content) and directories (content 'None') in 'root'.
+    """
+    for name, content in files.items():
+        path = root / name
+        if content is None:
+            path.mkdir(parents=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+
+
+def test_diff_directory_identical(tmp_path):
+    # Create identical trees (including a symlink) in the source and destination directories
+    tree = {
+        "file.txt": b"This is a file.",
+        "empty_dir": None,
+        "nested/file.txt": b"This is a nested file.",
+    }
+    for root in (tmp_path / "src", tmp_path / "dst"):
+        _make_tree(root, tree)
+        (root / "link.txt").symlink_to("file.txt")
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=tmp_path / "dst",
+        install_files=[(str(tmp_path / "src"), ".")]
+    )
+
+    # Perform the diff
+    assert not group.diff(use_pager=False)
+
+
+def test_diff_directory_entries(tmp_path, capsys, monkeypatch):
+    # print the diffs without 'delta'
+    monkeypatch.setattr(confit, "delta", None, raising=False)
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    _make_tree(src_dir, {
+        "same.txt": b"This is the same file.",
+        "dir_vs_file": None,
+        "file_vs_dir": b"This is a file.",
+        "only_in_src.txt": b"This file is only in the source.",
+        "only_in_src_dir": None,
+        "nested/changed.txt": b"This is file 1.",
+    })
+    _make_tree(dst_dir, {
+        "same.txt": b"This is the same file.",
+        "dir_vs_file": b"This is a file.",
+        "file_vs_dir": None,
+        "only_in_dst.txt": b"This file is only in the destination.",
+        "nested/changed.txt": b"This is a different file 1.",
+    })
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir), ".")]
+    )
+
+    # Perform the diff
+    assert group.diff()
+
+    # Check if all differences have been reported
+    output = capsys.readouterr().out
+    assert f"'{src_dir / 'dir_vs_file'}' is a directory while '{dst_dir / 'dir_vs_file'}' is a file." in output
+    assert f"'{src_dir / 'file_vs_dir'}' is a file while '{dst_dir / 'file_vs_dir'}' is a directory." in output
+    assert f"File '{src_dir / 'only_in_src.txt'}' exists in this repo but not in the destination." in output
+    assert f"Directory '{src_dir / 'only_in_src_dir'}' exists in this repo but not in the destination." in output
+    assert f"File '{dst_dir / 'only_in_dst.txt'}' exists in the destination but not in this repo." in output
+    assert "+This is a different file 1." in output
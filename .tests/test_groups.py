@@ -1,11 +1,11 @@
 import pytest
-from import_confit import confit
+import confit
 from unittest.mock import patch, MagicMock
 
 
 @pytest.fixture
 def mock_load_config():
-    with patch('import_confit.confit.load_config') as mock_load:
+    with patch('confit.load_config') as mock_load:
         mock_load.return_value = (
             {
                 'groups': {
@@ -27,8 +27,10 @@ def mock_load_config():
         yield mock_load
 
 
-def test_groups_cmd_all_groups(capsys, mock_load_config):
-    confit.config, confit.groups = confit.load_config()
+def test_groups_cmd_all_groups(capsys, mock_load_config, monkeypatch):
+    config, groups = confit.load_config()
+    monkeypatch.setattr(confit, "config", config, raising=False)
+    monkeypatch.setattr(confit, "groups", groups, raising=False)
     args = MagicMock()
     args.group = None
     confit.groups_cmd(args)
@@ -37,8 +39,10 @@ def test_groups_cmd_all_groups(capsys, mock_load_config):
     assert "group2" in captured.out
 
 
-def test_groups_cmd_specific_group(capsys, mock_load_config):
-    confit.config, confit.groups = confit.load_config()
+def test_groups_cmd_specific_group(capsys, mock_load_config, monkeypatch):
+    config, groups = confit.load_config()
+    monkeypatch.setattr(confit, "config", config, raising=False)
+    monkeypatch.setattr(confit, "groups", groups, raising=False)
     args = MagicMock()
     args.group = 'group1'
     confit.groups_cmd(args)
@@ -48,8 +52,10 @@ def test_groups_cmd_specific_group(capsys, mock_load_config):
     assert "install_files" in captured.out
 
 
-def test_groups_cmd_nonexistent_group(capsys, mock_load_config):
-    confit.config, confit.groups = confit.load_config()
+def test_groups_cmd_nonexistent_group(capsys, mock_load_config, monkeypatch):
+    config, groups = confit.load_config()
+    monkeypatch.setattr(confit, "config", config, raising=False)
+    monkeypatch.setattr(confit, "groups", groups, raising=False)
     args = MagicMock()
     args.group = 'nonexistent'
     confit.groups_cmd(args)
@@ -1,330 +1,162 @@
+import os
+import re
 import pytest
-import tempfile
 from pathlib import Path
-from import_confit import confit
-
-
-def test_install_file_cp():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in the source directory
-        src_file = src_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
-        # Perform the install
-        group.install(force=False)
-
-        # Check if the file was copied correctly
-        dst_file = dst_dir / "testfile.txt"
-        assert dst_file.exists()
-        with open(dst_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-def test_install_file_rsync():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in the source directory
-        src_file = src_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-
-        # enable rsync for this test
-        confit.rsync = confit.find_rsync()
-        assert "rsync" in confit.rsync, "Test failed because of missing 'rsync'"
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
-        # Perform the install
-        group.install(force=False)
-
-        # Check if the file was copied correctly
-        dst_file = dst_dir / "testfile.txt"
-        assert dst_file.exists()
-        with open(dst_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-def test_install_if_dest_file_exists_cp():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in the source directory
-        src_file = src_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-
-        # Create a file in the destination directory to simulate existing file
-        dst_file = dst_dir / "testfile.txt"
-        with open(dst_file, "w") as f:
-            f.write("This file already exists.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
+from typing import Dict
+import confit
+
+
+# error raised by 'install()' if the destination already exists
+_DEST_EXISTS_RE = re.compile(r"Destination '.*' exists .*")
+
+
+def _make_fixture(files: Dict[Path, bytes]) -> None:
+    """
+    Create the given files with the given (binary) content.
+    """
+    for path, content in files.items():
+        path.write_bytes(content)
+
+
+@pytest.fixture(scope="module")
+def src_tree(tmp_path_factory):
+    """
+    The installation sources, created once for all tests in this module:
+    a single file ('testfile.txt') and a directory tree ('src/').
+    The tests only read from it, so each one only needs its own destination.
+    NOTE: 'tmp_path_factory' and 'tmp_path' share the same base directory, so sources
+    and destinations are on the same filesystem (allowing 'cp' to use reflinks or
+    'copy_file_range()' where the filesystem supports it).
+    """
+    root = tmp_path_factory.mktemp("install")
+    src_dir = root / "src"
+    sub_dir_with_files = src_dir / "subdir_with_files"
+    (src_dir / "empty_subdir").mkdir(parents=True)
+    sub_dir_with_files.mkdir()
+    _make_fixture({
+        root / "testfile.txt": b"This is a test file.",
+        sub_dir_with_files / "file1.txt": b"This is file 1.",
+        sub_dir_with_files / "file2.txt": b"This is file 2.",
+        sub_dir_with_files / "file3.txt": b"This is file 3.",
+    })
+    return root
+
+
+def _verify_file(dst_dir: Path) -> None:
+    """
+    Check if the file was copied correctly.
+    """
+    dst_file = dst_dir / "testfile.txt"
+    assert dst_file.read_text() == "This is a test file."
+
+
+def _verify_directory(dst_dir: Path) -> None:
+    """
+    Check if the directory and files were copied correctly.
+    """
+    # scan each directory once instead of calling 'exists()' / 'is_dir()' per entry
+    dst_sub_dir_with_files = dst_dir / "src" / "subdir_with_files"
+    with os.scandir(dst_dir / "src") as entries:
+        sub_dirs = {e.name for e in entries if e.is_dir()}
+    assert {"empty_subdir", "subdir_with_files"} <= sub_dirs
+    with os.scandir(dst_sub_dir_with_files) as entries:
+        files = {e.name for e in entries if e.is_file()}
+    assert {"file1.txt", "file2.txt", "file3.txt"} <= files
+
+    assert (dst_sub_dir_with_files / "file1.txt").read_text() == "This is file 1."
+    assert (dst_sub_dir_with_files / "file2.txt").read_text() == "This is file 2."
+    assert (dst_sub_dir_with_files / "file3.txt").read_text() == "This is file 3."
+
+
+def _run_install_and_verify(src_tree: Path, tmp_path: Path, directory: bool, dst_exists: bool) -> None:
+    """
+    Install a file or directory from 'src_tree' and verify the result.
+    If 'dst_exists' is True, the destination is created before the installation,
+    which must then fail unless it's forced.
+    """
+    dst_dir = tmp_path / "dst"
+    dst_dir.mkdir()
+    if directory:
+        src = src_tree / "src"
+        dst = "src"
+        if dst_exists:
+            # Create a directory in the destination to simulate existing directory
+            (dst_dir / "src" / "empty_subdir").mkdir(parents=True)
+            (dst_dir / "src" / "subdir_with_files").mkdir(parents=True)
+    else:
+        src = src_tree / "testfile.txt"
+        dst = "testfile.txt"
+        if dst_exists:
+            # Create a file in the destination directory to simulate existing file
+            # -> the content is different, which makes the check easy
+            _make_fixture({dst_dir / dst: b"This file already exists."})
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src), dst)]
+    )
+
+    if dst_exists:
         # Perform the install and expect an exception
-        with pytest.raises(confit.ConfitError, match="Destination '.*' exists .*"):
+        with pytest.raises(confit.ConfitError, match=_DEST_EXISTS_RE):
             group.install(force=False)
-
         # repeat with force flag
         group.install(force=True)
-
-        # check that the destination file has been overwritten
-        # -> the content is different, which makes the check easy
-        assert dst_file.exists()
-        with open(dst_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-def test_install_directory_cp():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create subdirectories and files in the source directory
-        sub_dir_empty = src_dir / "empty_subdir"
-        sub_dir_with_files = src_dir / "subdir_with_files"
-        sub_dir_empty.mkdir()
-        sub_dir_with_files.mkdir()
-
-        file1 = sub_dir_with_files / "file1.txt"
-        file2 = sub_dir_with_files / "file2.txt"
-        file3 = sub_dir_with_files / "file3.txt"
-
-        with open(file1, "w") as f:
-            f.write("This is file 1.")
-        with open(file2, "w") as f:
-            f.write("This is file 2.")
-        with open(file3, "w") as f:
-            f.write("This is file 3.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir), "src")]
-        )
-
-        # Perform the install
-        group.install(force=False)
-
-        # Check if the directory and files were copied correctly
-        dst_sub_dir_empty = dst_dir / "src" / "empty_subdir"
-        dst_sub_dir_with_files = dst_dir / "src" / "subdir_with_files"
-        assert dst_sub_dir_empty.exists() and dst_sub_dir_empty.is_dir()
-        assert dst_sub_dir_with_files.exists() and dst_sub_dir_with_files.is_dir()
-
-        dst_file1 = dst_sub_dir_with_files / "file1.txt"
-        dst_file2 = dst_sub_dir_with_files / "file2.txt"
-        dst_file3 = dst_sub_dir_with_files / "file3.txt"
-
-        assert dst_file1.exists()
-        assert dst_file2.exists()
-        assert dst_file3.exists()
-
-        with open(dst_file1, "r") as f:
-            content = f.read()
-            assert content == "This is file 1."
-        with open(dst_file2, "r") as f:
-            content = f.read()
-            assert content == "This is file 2."
-        with open(dst_file3, "r") as f:
-            content = f.read()
-            assert content == "This is file 3."
-
-
-def test_install_directory_rsync():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create subdirectories and files in the source directory
-        sub_dir_empty = src_dir / "empty_subdir"
-        sub_dir_with_files = src_dir / "subdir_with_files"
-        sub_dir_empty.mkdir()
-        sub_dir_with_files.mkdir()
-
-        file1 = sub_dir_with_files / "file1.txt"
-        file2 = sub_dir_with_files / "file2.txt"
-        file3 = sub_dir_with_files / "file3.txt"
-
-        with open(file1, "w") as f:
-            f.write("This is file 1.")
-        with open(file2, "w") as f:
-            f.write("This is file 2.")
-        with open(file3, "w") as f:
-            f.write("This is file 3.")
-
-        # enable rsync for this test
-        confit.rsync = confit.find_rsync()
-        assert "rsync" in confit.rsync, "Test failed because of missing 'rsync'"
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir), "src")]
-        )
-
+    else:
         # Perform the install
         group.install(force=False)
 
-        # Check if the directory and files were copied correctly
-        dst_sub_dir_empty = dst_dir / "src" / "empty_subdir"
-        dst_sub_dir_with_files = dst_dir / "src" / "subdir_with_files"
-        assert dst_sub_dir_empty.exists() and dst_sub_dir_empty.is_dir()
-        assert dst_sub_dir_with_files.exists() and dst_sub_dir_with_files.is_dir()
-
-        dst_file1 = dst_sub_dir_with_files / "file1.txt"
-        dst_file2 = dst_sub_dir_with_files / "file2.txt"
-        dst_file3 = dst_sub_dir_with_files / "file3.txt"
-
-        assert dst_file1.exists()
-        assert dst_file2.exists()
-        assert dst_file3.exists()
+    if directory:
+        _verify_directory(dst_dir)
+    else:
+        _verify_file(dst_dir)
 
-        with open(dst_file1, "r") as f:
-            content = f.read()
-            assert content == "This is file 1."
-        with open(dst_file2, "r") as f:
-            content = f.read()
-            assert content == "This is file 2."
-        with open(dst_file3, "r") as f:
-            content = f.read()
-            assert content == "This is file 3."
 
+def test_install_file(src_tree, tmp_path, use_rsync):
+    _run_install_and_verify(src_tree, tmp_path, directory=False, dst_exists=False)
 
-def test_install_if_dest_directory_exists_cp():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
 
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
+def test_install_if_dest_file_exists(src_tree, tmp_path, use_rsync):
+    _run_install_and_verify(src_tree, tmp_path, directory=False, dst_exists=True)
 
-        # Create subdirectories and files in the source directory
-        sub_dir_empty = src_dir / "empty_subdir"
-        sub_dir_with_files = src_dir / "subdir_with_files"
-        sub_dir_empty.mkdir()
-        sub_dir_with_files.mkdir()
 
-        file1 = sub_dir_with_files / "file1.txt"
-        file2 = sub_dir_with_files / "file2.txt"
-        file3 = sub_dir_with_files / "file3.txt"
+def test_install_directory(src_tree, tmp_path, use_rsync):
+    _run_install_and_verify(src_tree, tmp_path, directory=True, dst_exists=False)
 
-        with open(file1, "w") as f:
-            f.write("This is file 1.")
-        with open(file2, "w") as f:
-            f.write("This is file 2.")
-        with open(file3, "w") as f:
-            f.write("This is file 3.")
 
-        # Create a directory in the destination to simulate existing directory
-        dst_sub_dir_empty = dst_dir / "src" / "empty_subdir"
-        dst_sub_dir_with_files = dst_dir / "src" / "subdir_with_files"
-        dst_sub_dir_empty.mkdir(parents=True)
-        dst_sub_dir_with_files.mkdir(parents=True)
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir), "src")]
-        )
-
-        # Perform the install and expect an exception
-        with pytest.raises(confit.ConfitError, match="Destination '.*' exists .*"):
-            group.install(force=False)
-
-        # repeat with force flag
-        group.install(force=True)
+def test_install_if_dest_directory_exists(src_tree, tmp_path, use_rsync):
+    _run_install_and_verify(src_tree, tmp_path, directory=True, dst_exists=True)
 
-        # Check if the directory and files were copied correctly
-        assert dst_sub_dir_empty.exists() and dst_sub_dir_empty.is_dir()
-        assert dst_sub_dir_with_files.exists() and dst_sub_dir_with_files.is_dir()
 
-        dst_file1 = dst_sub_dir_with_files / "file1.txt"
-        dst_file2 = dst_sub_dir_with_files / "file2.txt"
-        dst_file3 = dst_sub_dir_with_files / "file3.txt"
+def test_install_directory_with_symlink(tmp_path, use_rsync):
+    # Create a source directory containing a relative symlink
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+    _make_fixture({src_dir / "testfile.txt": b"This is a test file."})
+    (src_dir / "link.txt").symlink_to("testfile.txt")
+    dst_dir = tmp_path / "dst"
+    dst_dir.mkdir()
 
-        assert dst_file1.exists()
-        assert dst_file2.exists()
-        assert dst_file3.exists()
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir), "src")]
+    )
 
-        with open(dst_file1, "r") as f:
-            content = f.read()
-            assert content == "This is file 1."
-        with open(dst_file2, "r") as f:
-            content = f.read()
-            assert content == "This is file 2."
-        with open(dst_file3, "r") as f:
-            content = f.read()
-            assert content == "This is file 3."
+    # Perform the install
+    group.install(force=False)
 
+    # the symlink is copied as a symlink
+    dst_link = dst_dir / "src" / "link.txt"
+    assert dst_link.is_symlink()
+    assert os.readlink(dst_link) == "testfile.txt"
+    assert dst_link.read_text() == "This is a test file."
 
-if __name__ == "__main__":
-    pytest.main()
+    # installing again replaces the existing symlink
+    group.install(force=True)
+    assert dst_link.is_symlink()
+    assert os.readlink(dst_link) == "testfile.txt"
+    assert dst_link.read_text() == "This is a test file."
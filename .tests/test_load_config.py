@@ -1,229 +1,301 @@
+import io
+import os
+import re
 import pytest
-import tempfile
 from pathlib import Path
-from import_confit import confit, ConfitError
+import confit
+from confit import ConfitError
 from unittest.mock import patch
 
 
-def create_config_file(content, tempdir):
-    config_file = Path(tempdir) / ".conf.it"
-    with open(config_file, "w") as f:
-        f.write(content)
+_CFG_VALID = """
+groups:
+  testgroup:
+    name: test
+    dest: /tmp/dest
+    install_files:
+      - [src.txt, dst.txt]
+    check_binaries:
+      - [binary1, description1]
+    post_install_cmds:
+      - [command1, /tmp]
+"""
+
+_CFG_SYNC_FILES_OMITTED = """
+groups:
+  testgroup:
+    name: test
+    dest: /tmp/dest
+    install_files:
+      - [src.txt, dst.txt]
+"""
+
+_CFG_SYNC_FILES_EMPTY = """
+groups:
+  testgroup:
+    name: test
+    dest: /tmp/dest
+    install_files:
+      - [src.txt, dst.txt]
+    sync_files: []
+"""
+
+_CFG_SYNC_FILES_SPECIFIED = """
+groups:
+  testgroup:
+    name: test
+    dest: /tmp/dest
+    install_files:
+      - [src.txt, dst.txt]
+    sync_files:
+      - [sync_src.txt, sync_dst.txt]
+"""
+
+_CFG_INVALID_SYNTAX = """
+groups:
+  testgroup:
+    name: test
+    dest: /tmp/dest
+    install_files:
+      - [src.txt, dst.txt
+"""
+
+_CFG_HOST = """
+groups:
+  testgroup:
+    name: test
+    dest: /tmp/dest
+    install_files:
+      - [src.txt, dst.txt]
+    hosts:
+      - testhost
+"""
+
+# pre-parsed config (for tests of the validation that don't need the YAML parser)
+_RAW_DUPLICATE = {
+    'groups': {
+        'group1': {
+            'name': 'duplicate',
+            'dest': '/tmp/dest1',
+            'install_files': [['src1.txt', 'dst1.txt']],
+        },
+        'group2': {
+            'name': 'duplicate',
+            'dest': '/tmp/dest2',
+            'install_files': [['src2.txt', 'dst2.txt']],
+        },
+    }
+}
+
+_CFG_DUPLICATE_HOSTS = """
+groups:
+  group1:
+    name: duplicate
+    dest: /tmp/dest1
+    install_files:
+      - [src1.txt, dst1.txt]
+    hosts:
+      - testhost
+  group2:
+    name: duplicate
+    dest: /tmp/dest2
+    install_files:
+      - [src2.txt, dst2.txt]
+    hosts:
+      - otherhost
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """
+    Make sure that each test actually parses its config file.
+    """
+    confit.invalidate_config_cache()
+    yield
+    confit.invalidate_config_cache()
+
+
+@pytest.fixture(scope="module")
+def configs(tmp_path_factory):
+    """
+    The config files of this module, written only once (indexed by name).
+    Tests must not modify them (use 'create_config_file()' instead).
+    """
+    corpus = {
+        'valid': _CFG_VALID,
+        'sync_files_omitted': _CFG_SYNC_FILES_OMITTED,
+    }
+    config_dir = tmp_path_factory.mktemp("configs")
+    for name, content in corpus.items():
+        (config_dir / name).write_text(content)
+    return {name: str(config_dir / name) for name in corpus}
+
+
+def create_config_file(content, tempdir_path):
+    config_file = tempdir_path / ".conf.it"
+    # the content is tiny, so a single unbuffered write is sufficient
+    fd = os.open(config_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content.encode())
+    finally:
+        os.close(fd)
     return config_file
 
 
 def test_load_config_valid():
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt]
-            check_binaries:
-              - [binary1, description1]
-            post_install_cmds:
-              - [command1, /tmp]
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "test" in groups
-        assert groups["test"].dest == Path("/tmp/dest")
-        assert groups["test"].check_binaries == [("binary1", "description1")]
-        assert groups["test"].post_install_cmds == [("command1", "/tmp")]
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_VALID)])
+    assert "test" in groups
+    assert groups["test"].dest == Path("/tmp/dest")
+    assert groups["test"].check_binaries == [("binary1", "description1")]
+    assert groups["test"].post_install_cmds == [("command1", "/tmp")]
 
 
 def test_load_config_sync_files_omitted():
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt]
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "test" in groups
-        assert groups["test"].sync_files == groups["test"].install_files
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_SYNC_FILES_OMITTED)])
+    assert "test" in groups
+    assert groups["test"].sync_files == groups["test"].install_files
 
 
 def test_load_config_sync_files_empty():
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt]
-            sync_files: []
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "test" in groups
-        assert groups["test"].sync_files == []
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_SYNC_FILES_EMPTY)])
+    assert "test" in groups
+    assert groups["test"].sync_files == []
 
 
 def test_load_config_sync_files_specified():
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt]
-            sync_files:
-              - [sync_src.txt, sync_dst.txt]
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "test" in groups
-        assert groups["test"].sync_files == [("sync_src.txt", "sync_dst.txt")]
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_SYNC_FILES_SPECIFIED)])
+    assert "test" in groups
+    assert groups["test"].sync_files == [("sync_src.txt", "sync_dst.txt")]
 
 
 def test_load_config_invalid_syntax():
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        with pytest.raises(ConfitError):
-            confit.load_config()
-
-
-def test_load_config_invalid_mapping():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in the source directory
-        src_file = src_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-
-        config_content = f"""
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [{src_file}, {dst_dir}]
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        with pytest.raises(ConfitError, match="Invalid mapping in group 'test'"):
-            confit.load_config()
-
-
-def test_load_config_missing_file():
-    confit.confit_files = ["/nonexistent/.conf.it"]
     with pytest.raises(ConfitError):
+        confit.load_config(sources=[io.StringIO(_CFG_INVALID_SYNTAX)])
+
+
+def test_load_config_invalid_mapping(tmp_path):
+    # Create source and destination directories
+    src_dir = tmp_path / "src"
+    dst_dir = tmp_path / "dst"
+    src_dir.mkdir()
+    dst_dir.mkdir()
+
+    # Create a sample file in the source directory
+    src_file = src_dir / "testfile.txt"
+    src_file.write_bytes(b"This is a test file.")
+
+    raw_config = {
+        'groups': {
+            'testgroup': {
+                'name': 'test',
+                'dest': '/tmp/dest',
+                'install_files': [[str(src_file), str(dst_dir)]],
+            }
+        }
+    }
+    with pytest.raises(ConfitError, match=re.escape(confit._ERR_INVALID_MAPPING.format(name='test'))):
+        confit._validate(raw_config)
+
+
+def test_load_config_mapping_with_symlink_loop(tmp_path):
+    # a symlink loop is treated like a missing path
+    loop = tmp_path / "loop"
+    loop.symlink_to("loop")
+    raw_config = {
+        'groups': {
+            'testgroup': {
+                'name': 'test',
+                'dest': '/tmp/dest',
+                'install_files': [[str(loop), str(tmp_path)]],
+            }
+        }
+    }
+    config, groups = confit._validate(raw_config)
+    assert "test" in groups
+
+
+def test_load_config_missing_file(monkeypatch):
+    monkeypatch.setattr(confit, "confit_files", ["/nonexistent/.conf.it"])
+    with pytest.raises(ConfitError):
+        confit.load_config()
+
+
+def test_load_config_symlink_loop(tmp_path, monkeypatch):
+    # a config file that is a symlink loop is skipped
+    loop = tmp_path / ".conf.it"
+    loop.symlink_to(".conf.it")
+    monkeypatch.setattr(confit, "confit_files", [str(loop)])
+    with pytest.raises(ConfitError, match="Could not find a valid 'conf.it' file."):
         confit.load_config()
 
 
-@patch('import_confit.confit.get_hostname', return_value='testhost')
+@patch('confit.get_hostname', return_value='testhost')
 def test_load_config_with_host_filter(mock_get_hostname):
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt]
-            hosts:
-              - testhost
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "test" in groups
-        assert groups["test"].dest == Path("/tmp/dest")
-
-
-@patch('import_confit.confit.get_hostname', return_value='wronghost')
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_HOST)])
+    assert "test" in groups
+    assert groups["test"].dest == Path("/tmp/dest")
+
+
+@patch('confit.get_hostname', return_value='wronghost')
 def test_load_config_with_host_filter_no_match(mock_get_hostname):
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          testgroup:
-            name: test
-            dest: /tmp/dest
-            install_files:
-              - [src.txt, dst.txt]
-            hosts:
-              - testhost
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "test" not in groups
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_HOST)])
+    assert "test" not in groups
+
+
+@patch('confit.get_hostname', return_value='testhost')
+def test_load_config_without_host_filter(mock_get_hostname):
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_SYNC_FILES_OMITTED)])
+    assert "test" in groups
+    # the hostname is not needed if no group has a host filter
+    mock_get_hostname.assert_not_called()
+
+
+def test_get_hostname_cached(monkeypatch):
+    monkeypatch.setenv('HOSTNAME', 'host1')
+    assert confit.get_hostname() == 'host1'
+    # the hostname is only determined once
+    monkeypatch.setenv('HOSTNAME', 'host2')
+    assert confit.get_hostname() == 'host1'
+    # ... until the cache is invalidated
+    confit.invalidate_config_cache()
+    assert confit.get_hostname() == 'host2'
 
 
 def test_load_config_duplicate_group_names():
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          group1:
-            name: duplicate
-            dest: /tmp/dest1
-            install_files:
-              - [src1.txt, dst1.txt]
-          group2:
-            name: duplicate
-            dest: /tmp/dest2
-            install_files:
-              - [src2.txt, dst2.txt]
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        with pytest.raises(ConfitError, match="Found two groups with wih identical name 'duplicate'"):
-            confit.load_config()
-
-
-@patch('import_confit.confit.get_hostname', return_value='testhost')
+    with pytest.raises(ConfitError, match=re.escape(confit._ERR_DUP.format(name='duplicate'))):
+        confit._validate(_RAW_DUPLICATE)
+
+
+@patch('confit.get_hostname', return_value='testhost')
 def test_load_config_duplicate_group_names_with_different_hosts(mock_get_hostname):
-    with tempfile.TemporaryDirectory() as tempdir:
-        config_content = """
-        groups:
-          group1:
-            name: duplicate
-            dest: /tmp/dest1
-            install_files:
-              - [src1.txt, dst1.txt]
-            hosts:
-              - testhost
-          group2:
-            name: duplicate
-            dest: /tmp/dest2
-            install_files:
-              - [src2.txt, dst2.txt]
-            hosts:
-              - otherhost
-        """
-        create_config_file(config_content, tempdir)
-        confit.confit_files = [str(Path(tempdir) / ".conf.it")]
-        config, groups = confit.load_config()
-        assert "duplicate" in groups
-        assert groups["duplicate"].dest == Path("/tmp/dest1")
+    config, groups = confit.load_config(sources=[io.StringIO(_CFG_DUPLICATE_HOSTS)])
+    assert "duplicate" in groups
+    assert groups["duplicate"].dest == Path("/tmp/dest1")
+
+
+def test_load_config_from_file(configs, monkeypatch):
+    monkeypatch.setattr(confit, "confit_files", ["/nonexistent/.conf.it", configs['valid']])
+    config, groups = confit.load_config()
+    assert "test" in groups
+    assert groups["test"].dest == Path("/tmp/dest")
+
+
+def test_load_config_cached(configs, monkeypatch):
+    monkeypatch.setattr(confit, "confit_files", [configs['sync_files_omitted']])
+    config, groups = confit.load_config()
+    # an unmodified config file is not parsed again
+    with patch('yaml.load') as mock_yaml_load:
+        assert confit.load_config() == (config, groups)
+        mock_yaml_load.assert_not_called()
+
+
+def test_load_config_cache_modified_file(tmp_path, monkeypatch):
+    create_config_file(_CFG_SYNC_FILES_OMITTED, tmp_path)
+    monkeypatch.setattr(confit, "confit_files", [str(tmp_path / ".conf.it")])
+    config, groups = confit.load_config()
+    assert groups["test"].sync_files == [("src.txt", "dst.txt")]
+    # a modified config file is parsed again
+    create_config_file(_CFG_SYNC_FILES_SPECIFIED, tmp_path)
+    config, groups = confit.load_config()
+    assert groups["test"].sync_files == [("sync_src.txt", "sync_dst.txt")]
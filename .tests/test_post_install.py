@@ -1,63 +1,142 @@
 import pytest
-import tempfile
-from pathlib import Path
-from import_confit import confit
+import confit
 import subprocess
 
 
-def test_post_install():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
+def test_post_install(tmp_path):
+    # Create a destination directory
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
 
-        # Create a destination directory
-        dest_dir = tempdir_path / "dest"
-        dest_dir.mkdir()
+    # Create a sample script to be executed
+    script_file = dest_dir / "script.sh"
+    script_file.write_bytes(b"#!/bin/bash\necho 'Hello, World!' > output.txt\n")
+    script_file.chmod(0o755)
 
-        # Create a sample script to be executed
-        script_file = dest_dir / "script.sh"
-        with open(script_file, "w") as f:
-            f.write("#!/bin/bash\necho 'Hello, World!' > output.txt\n")
-        script_file.chmod(0o755)
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dest_dir,
+        install_files=[],
+        post_install_cmds=[("./script.sh", ".")]
+    )
 
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dest_dir,
-            install_files=[],
-            post_install_cmds=[("./script.sh", ".")]
-        )
+    # Perform the post_install
+    group.post_install()
 
-        # Perform the post_install
+    # Check if the script was executed correctly
+    output_file = dest_dir / "output.txt"
+    assert output_file.exists()
+    assert output_file.read_text() == "Hello, World!\n"
+
+
+def test_post_install_with_nonexistent_script(tmp_path):
+    # Create a destination directory
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
+
+    # Define the ConfGroup with a nonexistent script
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dest_dir,
+        install_files=[],
+        post_install_cmds=[("./nonexistent.sh", ".")]
+    )
+
+    # Perform the post_install and expect an exception
+    with pytest.raises(subprocess.CalledProcessError):
         group.post_install()
 
-        # Check if the script was executed correctly
-        output_file = dest_dir / "output.txt"
-        assert output_file.exists()
-        with open(output_file, "r") as f:
-            content = f.read()
-            assert content == "Hello, World!\n"
 
+def test_post_install_multiple_commands(tmp_path):
+    # Create a destination directory
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
+
+    # Define the ConfGroup with multiple commands in the same directory
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dest_dir,
+        install_files=[],
+        post_install_cmds=[("echo 1 > output.txt", "."),
+                           ("echo 2 >> output.txt; echo 3 >> output.txt", "."),
+                           ("echo 4 >> output.txt", ".")]
+    )
+
+    # Perform the post_install
+    group.post_install()
+
+    # Check if all commands were executed in the given order
+    assert (dest_dir / "output.txt").read_text() == "1\n2\n3\n4\n"
+
+
+def test_post_install_stops_at_failing_command(tmp_path):
+    # Create a destination directory
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
+
+    # Define the ConfGroup with a failing command in the middle
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dest_dir,
+        install_files=[],
+        post_install_cmds=[("echo 1 > output.txt", "."),
+                           ("false; echo 2 >> output.txt; false", "."),
+                           ("echo 3 >> output.txt", ".")]
+    )
+
+    # Perform the post_install and expect an exception
+    with pytest.raises(subprocess.CalledProcessError):
+        group.post_install()
+
+    # the command after the failing one has not been executed
+    assert (dest_dir / "output.txt").read_text() == "1\n2\n"
+
+
+def test_post_install_commands_are_independent(tmp_path):
+    # Create a destination directory with a subdirectory
+    dest_dir = tmp_path / "dest"
+    (dest_dir / "sub").mkdir(parents=True)
+
+    # Define the ConfGroup with commands that change the shell state
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dest_dir,
+        install_files=[],
+        post_install_cmds=[("cd sub", "."),
+                           ("VAR=value", "."),
+                           ("echo \"$VAR\" > out1", "."),
+                           ("exit 0", "."),
+                           ("touch out2", ".")]
+    )
+
+    # Perform the post_install
+    group.post_install()
 
-def test_post_install_with_nonexistent_script():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
+    # 'cd' and variables don't affect the following commands
+    assert (dest_dir / "out1").read_text() == "\n"
+    assert not (dest_dir / "sub" / "out1").exists()
+    # 'exit 0' doesn't skip the following commands
+    assert (dest_dir / "out2").exists()
 
-        # Create a destination directory
-        dest_dir = tempdir_path / "dest"
-        dest_dir.mkdir()
 
-        # Define the ConfGroup with a nonexistent script
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dest_dir,
-            install_files=[],
-            post_install_cmds=[("./nonexistent.sh", ".")]
-        )
+def test_post_install_empty_command(tmp_path):
+    # Create a destination directory
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir()
 
-        # Perform the post_install and expect an exception
-        with pytest.raises(subprocess.CalledProcessError):
-            group.post_install()
+    # Define the ConfGroup with empty and comment-only commands
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dest_dir,
+        install_files=[],
+        post_install_cmds=[("", "."),
+                           ("# placeholder", "."),
+                           ("touch output.txt", ".")]
+    )
 
+    # Perform the post_install
+    group.post_install()
 
-if __name__ == "__main__":
-    pytest.main()
+    # the following command has been executed
+    assert (dest_dir / "output.txt").exists()
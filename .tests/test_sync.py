@@ -1,252 +1,188 @@
+import os
+import shutil
 import pytest
-import tempfile
-from pathlib import Path
-from import_confit import confit
-
-
-def test_sync_file_cp():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in the destination directory
-        dst_file = dst_dir / "testfile.txt"
-        with open(dst_file, "w") as f:
-            f.write("This is a test file.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir / "testfile.txt"), "testfile.txt")]
-        )
-
-        # Perform the sync
-        group.synchronize()
-
-        # Check if the file was copied correctly
-        src_file = src_dir / "testfile.txt"
-        assert src_file.exists()
-        with open(src_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-def test_sync_file_rsync():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create a sample file in the destination directory
-        dst_file = dst_dir / "testfile.txt"
-        with open(dst_file, "w") as f:
-            f.write("This is a test file.")
-
-        # enable rsync for this test
-        confit.rsync = confit.find_rsync()
-        assert "rsync" in confit.rsync, "Test failed because of missing 'rsync'"
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir / "testfile.txt"), "testfile.txt")]
-        )
-
-        # Perform the sync
-        group.synchronize()
-
-        # Check if the file was copied correctly
-        src_file = src_dir / "testfile.txt"
-        assert src_file.exists()
-        with open(src_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-def test_sync_directory_cp():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create subdirectories and files in the destination directory
-        sub_dir = dst_dir / "subdir"
-        sub_dir.mkdir()
-        file1 = sub_dir / "file1.txt"
-        file2 = sub_dir / "file2.txt"
-        with open(file1, "w") as f:
-            f.write("This is file 1.")
-        with open(file2, "w") as f:
-            f.write("This is file 2.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir / "subdir"), "subdir")]
-        )
-
-        # Perform the sync
-        group.synchronize()
-
-        # Check if the directory and files were copied correctly
-        src_sub_dir = src_dir / "subdir"
-        assert src_sub_dir.exists() and src_sub_dir.is_dir()
-
-        src_file1 = src_sub_dir / "file1.txt"
-        src_file2 = src_sub_dir / "file2.txt"
-
-        assert src_file1.exists()
-        assert src_file2.exists()
-
-        with open(src_file1, "r") as f:
-            content = f.read()
-            assert content == "This is file 1."
-        with open(src_file2, "r") as f:
-            content = f.read()
-            assert content == "This is file 2."
-
-
-def test_sync_directory_rsync():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source and destination directories
-        src_dir = tempdir_path / "src"
-        dst_dir = tempdir_path / "dst"
-        src_dir.mkdir()
-        dst_dir.mkdir()
-
-        # Create subdirectories and files in the destination directory
-        sub_dir = dst_dir / "subdir"
-        sub_dir.mkdir()
-        file1 = sub_dir / "file1.txt"
-        file2 = sub_dir / "file2.txt"
-        with open(file1, "w") as f:
-            f.write("This is file 1.")
-        with open(file2, "w") as f:
-            f.write("This is file 2.")
-
-        # enable rsync for this test
-        confit.rsync = confit.find_rsync()
-        assert "rsync" in confit.rsync, "Test failed because of missing 'rsync'"
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(src_dir / "subdir"), "subdir")]
-        )
-
-        # Perform the sync
-        group.synchronize()
-
-        # Check if the directory and files were copied correctly
-        src_sub_dir = src_dir / "subdir"
-        assert src_sub_dir.exists() and src_sub_dir.is_dir()
-
-        src_file1 = src_sub_dir / "file1.txt"
-        src_file2 = src_sub_dir / "file2.txt"
-
-        assert src_file1.exists()
-        assert src_file2.exists()
-
-        with open(src_file1, "r") as f:
-            content = f.read()
-            assert content == "This is file 1."
-        with open(src_file2, "r") as f:
-            content = f.read()
-            assert content == "This is file 2."
-
-
-def test_sync_create_source_path():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create destination directory
-        dst_dir = tempdir_path / "dst"
-        dst_dir.mkdir(parents=True)
-
-        # Create a sample file in the destination directory
-        dst_file = dst_dir / "subdir1/subdir2/testfile.txt"
-        dst_file.parent.mkdir(parents=True)
-        with open(dst_file, "w") as f:
-            f.write("This is a test file.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=dst_dir,
-            install_files=[(str(tempdir_path / "src/subdir1/subdir2/testfile.txt"), "subdir1/subdir2/testfile.txt")]
-        )
-
-        # Perform the sync
-        group.synchronize()
-
-        # Check if the source path and file were created correctly
-        src_file = tempdir_path / "src/subdir1/subdir2/testfile.txt"
-        assert src_file.exists()
-        with open(src_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-def test_sync_file_missing_in_dest():
-    with tempfile.TemporaryDirectory() as tempdir:
-        tempdir_path = Path(tempdir)
-
-        # Create source directory
-        src_dir = tempdir_path / "src"
-        src_dir.mkdir()
-
-        # Create a sample file in the source directory
-        src_file = src_dir / "testfile.txt"
-        with open(src_file, "w") as f:
-            f.write("This is a test file.")
-
-        # disable rsync for this test
-        confit.rsync = None
-
-        # Define the ConfGroup
-        group = confit.ConfGroup(
-            name="testgroup",
-            dest=tempdir_path / "dst",
-            install_files=[(str(src_file), "testfile.txt")]
-        )
-
-        # Perform the sync
-        group.synchronize()
-
-        # Check if the file was not deleted in the source directory
-        assert src_file.exists()
-        with open(src_file, "r") as f:
-            content = f.read()
-            assert content == "This is a test file."
-
-
-if __name__ == "__main__":
-    pytest.main()
+import confit
+
+
+@pytest.fixture(scope="module")
+def sync_skeleton(tmp_path_factory):
+    """
+    Template for the destination directory, created once for all tests in this module.
+    """
+    skeleton = tmp_path_factory.mktemp("sync_skeleton")
+    (skeleton / "subdir").mkdir()
+    (skeleton / "testfile.txt").write_bytes(b"This is a test file.")
+    (skeleton / "subdir" / "file1.txt").write_bytes(b"This is file 1.")
+    (skeleton / "subdir" / "file2.txt").write_bytes(b"This is file 2.")
+    return skeleton
+
+
+@pytest.fixture
+def dst_dir(sync_skeleton, tmp_path):
+    """
+    A destination directory for the current test, cloned from the skeleton.
+    The files are hard links (no data is copied), which is fine because
+    synchronization only reads from the destination.
+    """
+    return shutil.copytree(sync_skeleton, tmp_path / "dst", copy_function=os.link)
+
+
+def test_sync_file(dst_dir, tmp_path, use_rsync):
+    # Create source directory
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir / "testfile.txt"), "testfile.txt")]
+    )
+
+    # Perform the sync
+    group.synchronize()
+
+    # Check if the file was copied correctly
+    src_file = src_dir / "testfile.txt"
+    assert src_file.exists()
+    assert src_file.read_text() == "This is a test file."
+
+
+def test_sync_directory(dst_dir, tmp_path, use_rsync):
+    # Create source directory
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir / "subdir"), "subdir")]
+    )
+
+    # Perform the sync
+    group.synchronize()
+
+    # Check if the directory and files were copied correctly
+    src_sub_dir = src_dir / "subdir"
+    assert src_sub_dir.exists() and src_sub_dir.is_dir()
+
+    src_file1 = src_sub_dir / "file1.txt"
+    src_file2 = src_sub_dir / "file2.txt"
+
+    assert src_file1.exists()
+    assert src_file2.exists()
+
+    assert src_file1.read_text() == "This is file 1."
+    assert src_file2.read_text() == "This is file 2."
+
+
+def test_sync_directory_with_symlink_twice(tmp_path, use_rsync):
+    # Create a destination directory containing a relative symlink
+    dst_dir = tmp_path / "dst"
+    (dst_dir / "subdir").mkdir(parents=True)
+    (dst_dir / "subdir" / "file1.txt").write_bytes(b"This is file 1.")
+    (dst_dir / "subdir" / "link.txt").symlink_to("file1.txt")
+    src_dir = tmp_path / "src"
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir / "subdir"), "subdir")]
+    )
+
+    # Perform the sync twice (the second one overwrites the existing symlink)
+    group.synchronize()
+    group.synchronize()
+
+    # Check if the symlink was copied as a symlink
+    src_link = src_dir / "subdir" / "link.txt"
+    assert src_link.is_symlink()
+    assert os.readlink(src_link) == "file1.txt"
+    assert src_link.read_text() == "This is file 1."
+
+
+def test_sync_symlink_to_directory_twice(tmp_path, use_rsync):
+    # Create a target directory and symlinks to it in the destination and source directories
+    target_dir = tmp_path / "target"
+    target_dir.mkdir()
+    (target_dir / "file.txt").write_bytes(b"This is a test file.")
+    dst_dir = tmp_path / "dst"
+    dst_dir.mkdir()
+    (dst_dir / "link").symlink_to(target_dir)
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+    (src_dir / "link").symlink_to(target_dir)
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(src_dir / "link"), "link")]
+    )
+
+    # Perform the sync twice
+    group.synchronize()
+    group.synchronize()
+
+    # the symlink is replaced and the target directory is untouched
+    assert (src_dir / "link").is_symlink()
+    assert os.readlink(src_dir / "link") == str(target_dir)
+    assert [entry.name for entry in target_dir.iterdir()] == ["file.txt"]
+
+
+def test_sync_create_source_path(tmp_path, monkeypatch):
+    # Create destination directory
+    dst_dir = tmp_path / "dst"
+    dst_dir.mkdir(parents=True)
+
+    # Create a sample file in the destination directory
+    dst_file = dst_dir / "subdir1/subdir2/testfile.txt"
+    dst_file.parent.mkdir(parents=True)
+    dst_file.write_bytes(b"This is a test file.")
+
+    # disable rsync for this test
+    monkeypatch.setattr(confit, "rsync", None, raising=False)
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=dst_dir,
+        install_files=[(str(tmp_path / "src/subdir1/subdir2/testfile.txt"), "subdir1/subdir2/testfile.txt")]
+    )
+
+    # Perform the sync
+    group.synchronize()
+
+    # Check if the source path and file were created correctly
+    src_file = tmp_path / "src/subdir1/subdir2/testfile.txt"
+    assert src_file.exists()
+    assert src_file.read_text() == "This is a test file."
+
+
+def test_sync_file_missing_in_dest(tmp_path, monkeypatch):
+    # Create source directory
+    src_dir = tmp_path / "src"
+    src_dir.mkdir()
+
+    # Create a sample file in the source directory
+    src_file = src_dir / "testfile.txt"
+    src_file.write_bytes(b"This is a test file.")
+
+    # disable rsync for this test
+    monkeypatch.setattr(confit, "rsync", None, raising=False)
+
+    # Define the ConfGroup
+    group = confit.ConfGroup(
+        name="testgroup",
+        dest=tmp_path / "dst",
+        install_files=[(str(src_file), "testfile.txt")]
+    )
+
+    # Perform the sync
+    group.synchronize()
+
+    # Check if the file was not deleted in the source directory
+    assert src_file.exists()
+    assert src_file.read_text() == "This is a test file."